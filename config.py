@@ -20,15 +20,17 @@ class ServerConfig:
     websocket_ping_timeout: Optional[float] = 20.0
     
     # Remote control settings
-    mouse_move_duration: float = 0.01
+    mouse_move_duration: float = 0.0
     key_type_interval: float = 0.01
-    pyautogui_pause: float = 0.01
+    pyautogui_pause: float = 0.0
+    input_backend: str = "pyautogui"  # "pyautogui" or "native" (SendInput/uinput/Quartz)
     
     # mDNS settings
     service_type: str = "_remote-control._tcp.local."
     mdns_service_type: str = "_remote-control._tcp.local."
     mdns_protocol: str = "websocket"
     mdns_version: str = "1.0"
+    discovery_name_prefix: Optional[str] = None  # Only resolve services whose name starts with this
 
 # Default configuration
 DEFAULT_CONFIG = ServerConfig()
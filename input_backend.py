@@ -0,0 +1,488 @@
+import ctypes
+import logging
+import sys
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+import pyautogui
+
+logger = logging.getLogger(__name__)
+
+class InputBackend(ABC):
+    """Injects mouse and keyboard events into the operating system"""
+    
+    name = "base"
+    
+    @abstractmethod
+    def move_abs(self, x: int, y: int):
+        """Move the cursor to an absolute screen position"""
+    
+    @abstractmethod
+    def move_rel(self, dx: int, dy: int):
+        """Move the cursor relative to its current position"""
+    
+    @abstractmethod
+    def position(self) -> Tuple[int, int]:
+        """Get the current cursor position"""
+    
+    @abstractmethod
+    def click(self, button: str, clicks: int = 1, interval: float = 0.0):
+        """Click a mouse button ("left", "right" or "middle") one or more times"""
+    
+    def double_click(self):
+        """Double click the left mouse button"""
+        self.click("left", clicks=2)
+    
+    @abstractmethod
+    def scroll(self, amount: int):
+        """Scroll the mouse wheel at the current cursor position"""
+    
+    @abstractmethod
+    def key_down(self, key: str):
+        """Press and hold a key"""
+    
+    @abstractmethod
+    def key_up(self, key: str):
+        """Release a key"""
+    
+    @abstractmethod
+    def press(self, keys: Union[str, Sequence[str]], interval: float = 0.0):
+        """Press and release one key, or several keys in sequence"""
+    
+    @abstractmethod
+    def hotkey(self, *keys: str):
+        """Press a key combination and release it in reverse order"""
+    
+    @abstractmethod
+    def type_text(self, text: str, interval: float = 0.0):
+        """Type a string of characters"""
+    
+    def hold_keys(self, keys: Iterable[str]):
+        """Press and hold each key in order"""
+        key_down = self.key_down
+        for k in keys:
+            key_down(k)
+    
+    def release_keys(self, keys: Sequence[str]):
+        """Release each key in reverse order"""
+        key_up = self.key_up
+        for k in reversed(keys):
+            key_up(k)
+    
+    def close(self):
+        """Release any OS resources held by the backend"""
+
+class PyAutoGUIBackend(InputBackend):
+    """Portable backend built on pyautogui (keeps pyautogui's FAILSAFE corner check)"""
+    
+    name = "pyautogui"
+    
+    def move_abs(self, x: int, y: int):
+        pyautogui.moveTo(x, y, duration=0, _pause=False)
+    
+    def move_rel(self, dx: int, dy: int):
+        pyautogui.moveRel(dx, dy, duration=0, _pause=False)
+    
+    def position(self) -> Tuple[int, int]:
+        x, y = pyautogui.position()
+        return x, y
+    
+    # Button name -> pyautogui single-click function, resolved once
+    _SINGLE_CLICK = {
+        "left": pyautogui.leftClick,
+        "right": pyautogui.rightClick,
+        "middle": pyautogui.middleClick,
+    }
+    
+    def click(self, button: str, clicks: int = 1, interval: float = 0.0):
+        single = self._SINGLE_CLICK.get(button) if clicks == 1 else None
+        if single is not None:
+            single()
+        else:
+            pyautogui.click(button=button, clicks=clicks, interval=interval)
+    
+    def double_click(self):
+        pyautogui.doubleClick()
+    
+    def scroll(self, amount: int):
+        pyautogui.scroll(amount)
+    
+    def key_down(self, key: str):
+        pyautogui.keyDown(key)
+    
+    def key_up(self, key: str):
+        pyautogui.keyUp(key)
+    
+    def press(self, keys: Union[str, Sequence[str]], interval: float = 0.0):
+        pyautogui.press(keys, interval=interval)
+    
+    def hotkey(self, *keys: str):
+        pyautogui.hotkey(*keys)
+    
+    def type_text(self, text: str, interval: float = 0.0):
+        pyautogui.typewrite(text, interval=interval)
+
+class _NativeKeyboardBackend(PyAutoGUIBackend):
+    """Base for backends that inject keys found in a precomputed key map directly
+    
+    Keys missing from the map (and combinations containing one) go through pyautogui.
+    """
+    
+    def __init__(self):
+        # Key name -> backend key code, built once at startup
+        self._key_map: Dict[str, Any] = {}
+    
+    @abstractmethod
+    def _send_keys(self, events: Sequence[Tuple[Any, bool]]):
+        """Inject (key code, is key down) events in order"""
+    
+    def _codes(self, keys: Iterable[str]) -> Optional[List[Any]]:
+        """Map key names to codes, or None if any key is unknown"""
+        key_map = self._key_map
+        codes = [key_map.get(k) for k in keys]
+        return None if None in codes else codes
+    
+    def key_down(self, key: str):
+        code = self._key_map.get(key)
+        if code is None:
+            pyautogui.keyDown(key)
+        else:
+            self._send_keys([(code, True)])
+    
+    def key_up(self, key: str):
+        code = self._key_map.get(key)
+        if code is None:
+            pyautogui.keyUp(key)
+        else:
+            self._send_keys([(code, False)])
+    
+    def press(self, keys: Union[str, Sequence[str]], interval: float = 0.0):
+        if isinstance(keys, str):
+            keys = [keys]
+        codes = self._codes(keys)
+        if codes is None:
+            pyautogui.press(keys, interval=interval)
+        elif interval <= 0:
+            self._send_keys([(code, down) for code in codes for down in (True, False)])
+        else:
+            for i, code in enumerate(codes):
+                if i:
+                    time.sleep(interval)
+                self._send_keys([(code, True), (code, False)])
+    
+    def hotkey(self, *keys: str):
+        codes = self._codes(keys)
+        if codes is None:
+            pyautogui.hotkey(*keys)
+        else:
+            self._send_keys([(code, True) for code in codes] + [(code, False) for code in reversed(codes)])
+    
+    def hold_keys(self, keys: Iterable[str]):
+        codes = self._codes(keys)
+        if codes is None:
+            for k in keys:
+                pyautogui.keyDown(k)
+        else:
+            self._send_keys([(code, True) for code in codes])
+    
+    def release_keys(self, keys: Sequence[str]):
+        codes = self._codes(keys)
+        if codes is None:
+            for k in reversed(keys):
+                pyautogui.keyUp(k)
+        else:
+            self._send_keys([(code, False) for code in reversed(codes)])
+
+# Native backends inject mouse events directly. SendInput and uinput also inject
+# keys from a precomputed key map; everything else goes through pyautogui.
+
+if sys.platform == "win32":
+    from ctypes import wintypes
+    
+    _INPUT_MOUSE = 0
+    _INPUT_KEYBOARD = 1
+    _KEYEVENTF_KEYUP = 0x0002
+    _MOUSEEVENTF_MOVE = 0x0001
+    _MOUSEEVENTF_WHEEL = 0x0800
+    # Button name -> (down flag, up flag)
+    _MOUSE_BUTTON_FLAGS = {
+        "left": (0x0002, 0x0004),
+        "right": (0x0008, 0x0010),
+        "middle": (0x0020, 0x0040),
+    }
+    
+    class _MOUSEINPUT(ctypes.Structure):
+        _fields_ = [
+            ("dx", wintypes.LONG),
+            ("dy", wintypes.LONG),
+            ("mouseData", wintypes.DWORD),
+            ("dwFlags", wintypes.DWORD),
+            ("time", wintypes.DWORD),
+            ("dwExtraInfo", ctypes.c_size_t),
+        ]
+    
+    class _KEYBDINPUT(ctypes.Structure):
+        _fields_ = [
+            ("wVk", wintypes.WORD),
+            ("wScan", wintypes.WORD),
+            ("dwFlags", wintypes.DWORD),
+            ("time", wintypes.DWORD),
+            ("dwExtraInfo", ctypes.c_size_t),
+        ]
+    
+    class _HARDWAREINPUT(ctypes.Structure):
+        _fields_ = [
+            ("uMsg", wintypes.DWORD),
+            ("wParamL", wintypes.WORD),
+            ("wParamH", wintypes.WORD),
+        ]
+    
+    class _INPUTUNION(ctypes.Union):
+        _fields_ = [("mi", _MOUSEINPUT), ("ki", _KEYBDINPUT), ("hi", _HARDWAREINPUT)]
+    
+    class _INPUT(ctypes.Structure):
+        _anonymous_ = ("u",)
+        _fields_ = [("type", wintypes.DWORD), ("u", _INPUTUNION)]
+
+class SendInputBackend(_NativeKeyboardBackend):
+    """Windows backend: mouse and key events via user32 SetCursorPos/SendInput"""
+    
+    name = "sendinput"
+    
+    def __init__(self):
+        super().__init__()
+        self._user32 = ctypes.WinDLL("user32", use_last_error=True)
+        self._input_size = ctypes.sizeof(_INPUT)
+        
+        # Reuse pyautogui's virtual-key table, keeping keys that need no modifiers
+        # (the high byte of a VkKeyScan result holds shift/ctrl/alt state)
+        try:
+            from pyautogui import _pyautogui_win
+            self._key_map = {
+                name: vk for name, vk in _pyautogui_win.keyboardMapping.items()
+                if vk is not None and 0 < vk < 0x100 and not pyautogui.isShiftCharacter(name)
+            }
+        except (ImportError, AttributeError) as e:
+            logger.warning(f"Virtual-key table unavailable, keys go through pyautogui: {e}")
+    
+    def _send_keys(self, events: Sequence[Tuple[Any, bool]]):
+        inputs = []
+        for vk, down in events:
+            event = _INPUT(type=_INPUT_KEYBOARD)
+            event.ki = _KEYBDINPUT(vk, 0, 0 if down else _KEYEVENTF_KEYUP, 0, 0)
+            inputs.append(event)
+        self._send(inputs)
+    
+    def _mouse_input(self, flags: int, dx: int = 0, dy: int = 0, data: int = 0) -> "_INPUT":
+        event = _INPUT(type=_INPUT_MOUSE)
+        event.mi = _MOUSEINPUT(dx, dy, data & 0xFFFFFFFF, flags, 0, 0)
+        return event
+    
+    def _send(self, events: Sequence["_INPUT"]):
+        """Inject a batch of events with a single SendInput call"""
+        array = (_INPUT * len(events))(*events)
+        if self._user32.SendInput(len(events), array, self._input_size) != len(events):
+            raise ctypes.WinError(ctypes.get_last_error())
+    
+    def move_abs(self, x: int, y: int):
+        # SetCursorPos places the cursor on an exact pixel in one call
+        if not self._user32.SetCursorPos(int(x), int(y)):
+            raise ctypes.WinError(ctypes.get_last_error())
+    
+    def move_rel(self, dx: int, dy: int):
+        self._send([self._mouse_input(_MOUSEEVENTF_MOVE, int(dx), int(dy))])
+    
+    def position(self) -> Tuple[int, int]:
+        point = wintypes.POINT()
+        self._user32.GetCursorPos(ctypes.byref(point))
+        return point.x, point.y
+    
+    def click(self, button: str, clicks: int = 1, interval: float = 0.0):
+        down, up = _MOUSE_BUTTON_FLAGS[button]
+        if interval <= 0:
+            # All down/up pairs go out in one SendInput call
+            self._send([self._mouse_input(flag) for _ in range(clicks) for flag in (down, up)])
+            return
+        for i in range(clicks):
+            if i:
+                time.sleep(interval)
+            self._send([self._mouse_input(down), self._mouse_input(up)])
+    
+    def double_click(self):
+        self.click("left", clicks=2)
+    
+    def scroll(self, amount: int):
+        # Same units as pyautogui.scroll on Windows (raw wheel delta)
+        self._send([self._mouse_input(_MOUSEEVENTF_WHEEL, data=int(amount))])
+
+class UInputBackend(_NativeKeyboardBackend):
+    """Linux backend: mouse and key events via /dev/uinput virtual devices (python-uinput)"""
+    
+    name = "uinput"
+    
+    # Button name -> uinput event attribute
+    _BUTTONS = {"left": "BTN_LEFT", "right": "BTN_RIGHT", "middle": "BTN_MIDDLE"}
+    
+    # Key name -> uinput event attribute. Only layout-independent keys are listed:
+    # uinput sends key codes, so characters stay with pyautogui (which sends keysyms).
+    _KEYS = {
+        'backspace': 'KEY_BACKSPACE', 'delete': 'KEY_DELETE', 'del': 'KEY_DELETE',
+        'enter': 'KEY_ENTER', 'return': 'KEY_ENTER', 'tab': 'KEY_TAB',
+        'esc': 'KEY_ESC', 'escape': 'KEY_ESC',
+        'up': 'KEY_UP', 'down': 'KEY_DOWN', 'left': 'KEY_LEFT', 'right': 'KEY_RIGHT',
+        'home': 'KEY_HOME', 'end': 'KEY_END', 'pageup': 'KEY_PAGEUP', 'pagedown': 'KEY_PAGEDOWN',
+        'insert': 'KEY_INSERT', 'capslock': 'KEY_CAPSLOCK', 'numlock': 'KEY_NUMLOCK',
+        'scrolllock': 'KEY_SCROLLLOCK', 'printscreen': 'KEY_SYSRQ',
+        'ctrl': 'KEY_LEFTCTRL', 'ctrlleft': 'KEY_LEFTCTRL', 'ctrlright': 'KEY_RIGHTCTRL',
+        'alt': 'KEY_LEFTALT', 'altleft': 'KEY_LEFTALT', 'altright': 'KEY_RIGHTALT',
+        'shift': 'KEY_LEFTSHIFT', 'shiftleft': 'KEY_LEFTSHIFT', 'shiftright': 'KEY_RIGHTSHIFT',
+        'win': 'KEY_LEFTMETA', 'winleft': 'KEY_LEFTMETA', 'winright': 'KEY_RIGHTMETA',
+        'cmd': 'KEY_LEFTMETA',
+        'volumeup': 'KEY_VOLUMEUP', 'volumedown': 'KEY_VOLUMEDOWN', 'volumemute': 'KEY_MUTE',
+        'playpause': 'KEY_PLAYPAUSE', 'nexttrack': 'KEY_NEXTSONG', 'prevtrack': 'KEY_PREVIOUSSONG',
+        'browserback': 'KEY_BACK', 'browserforward': 'KEY_FORWARD', 'browserrefresh': 'KEY_REFRESH',
+        'browserstop': 'KEY_STOP', 'browsersearch': 'KEY_SEARCH',
+        'browserfavorites': 'KEY_BOOKMARKS', 'browserhome': 'KEY_HOMEPAGE',
+        **{f'f{n}': f'KEY_F{n}' for n in range(1, 13)},
+    }
+    
+    def __init__(self):
+        super().__init__()
+        import uinput
+        self._uinput = uinput
+        width, height = pyautogui.size()
+        self._device = uinput.Device([
+            uinput.BTN_LEFT, uinput.BTN_RIGHT, uinput.BTN_MIDDLE,
+            uinput.REL_WHEEL,
+            uinput.ABS_X + (0, width - 1, 0, 0),
+            uinput.ABS_Y + (0, height - 1, 0, 0),
+        ], name="remote-control-pointer")
+        # Relative motion needs its own device; mixing axes confuses input stacks
+        self._rel_device = None
+        self._buttons = {name: getattr(uinput, event) for name, event in self._BUTTONS.items()}
+        
+        # Resolve key names to uinput events once; keys need their own keyboard device
+        self._key_map = {
+            name: getattr(uinput, event) for name, event in self._KEYS.items()
+            if hasattr(uinput, event)
+        }
+        self._key_device = uinput.Device(
+            sorted(set(self._key_map.values())), name="remote-control-keyboard"
+        )
+    
+    def _send_keys(self, events: Sequence[Tuple[Any, bool]]):
+        emit = self._key_device.emit
+        for code, down in events:
+            emit(code, 1 if down else 0)
+    
+    def move_abs(self, x: int, y: int):
+        device = self._device
+        device.emit(self._uinput.ABS_X, int(x), syn=False)
+        device.emit(self._uinput.ABS_Y, int(y))
+    
+    def move_rel(self, dx: int, dy: int):
+        if self._rel_device is None:
+            self._rel_device = self._uinput.Device(
+                [self._uinput.REL_X, self._uinput.REL_Y], name="remote-control-relative"
+            )
+        self._rel_device.emit(self._uinput.REL_X, int(dx), syn=False)
+        self._rel_device.emit(self._uinput.REL_Y, int(dy))
+    
+    def click(self, button: str, clicks: int = 1, interval: float = 0.0):
+        event = self._buttons[button]
+        emit = self._device.emit
+        for i in range(clicks):
+            if i and interval > 0:
+                time.sleep(interval)
+            emit(event, 1)
+            emit(event, 0)
+    
+    def double_click(self):
+        self.click("left", clicks=2)
+    
+    def scroll(self, amount: int):
+        self._device.emit(self._uinput.REL_WHEEL, int(amount))
+    
+    def close(self):
+        self._device.destroy()
+        self._key_device.destroy()
+        if self._rel_device is not None:
+            self._rel_device.destroy()
+
+class QuartzBackend(PyAutoGUIBackend):
+    """macOS backend: mouse events posted directly with Quartz CGEventPost"""
+    
+    name = "quartz"
+    
+    def __init__(self):
+        import Quartz
+        self._quartz = Quartz
+        # Button name -> (down event, up event, CG button)
+        self._buttons = {
+            "left": (Quartz.kCGEventLeftMouseDown, Quartz.kCGEventLeftMouseUp, Quartz.kCGMouseButtonLeft),
+            "right": (Quartz.kCGEventRightMouseDown, Quartz.kCGEventRightMouseUp, Quartz.kCGMouseButtonRight),
+            "middle": (Quartz.kCGEventOtherMouseDown, Quartz.kCGEventOtherMouseUp, Quartz.kCGMouseButtonCenter),
+        }
+    
+    def _post_mouse(self, event_type, x: float, y: float, button, click_state: int = 0):
+        quartz = self._quartz
+        event = quartz.CGEventCreateMouseEvent(None, event_type, (x, y), button)
+        if click_state:
+            quartz.CGEventSetIntegerValueField(event, quartz.kCGMouseEventClickState, click_state)
+        quartz.CGEventPost(quartz.kCGHIDEventTap, event)
+    
+    def move_abs(self, x: int, y: int):
+        self._post_mouse(self._quartz.kCGEventMouseMoved, x, y, self._quartz.kCGMouseButtonLeft)
+    
+    def move_rel(self, dx: int, dy: int):
+        x, y = self.position()
+        self.move_abs(x + dx, y + dy)
+    
+    def position(self) -> Tuple[int, int]:
+        location = self._quartz.CGEventGetLocation(self._quartz.CGEventCreate(None))
+        return int(location.x), int(location.y)
+    
+    def click(self, button: str, clicks: int = 1, interval: float = 0.0):
+        down, up, cg_button = self._buttons[button]
+        x, y = self.position()
+        for i in range(1, clicks + 1):
+            if i > 1 and interval > 0:
+                time.sleep(interval)
+            # The click state lets the OS recognise double/triple clicks
+            self._post_mouse(down, x, y, cg_button, i)
+            self._post_mouse(up, x, y, cg_button, i)
+    
+    def double_click(self):
+        self.click("left", clicks=2)
+    
+    def scroll(self, amount: int):
+        quartz = self._quartz
+        event = quartz.CGEventCreateScrollWheelEvent(None, quartz.kCGScrollEventUnitLine, 1, int(amount))
+        quartz.CGEventPost(quartz.kCGHIDEventTap, event)
+
+def create_backend(name: str = "pyautogui") -> InputBackend:
+    """Create the input backend selected in the configuration
+    
+    "pyautogui" is portable and honours pyautogui.FAILSAFE. "native" uses the
+    platform's input API for mouse events (SendInput, uinput or Quartz) and
+    falls back to pyautogui when that is unavailable.
+    """
+    if name == "pyautogui":
+        return PyAutoGUIBackend()
+    if name != "native":
+        raise ValueError(f"Unknown input backend: {name}")
+    
+    try:
+        if sys.platform == "win32":
+            backend = SendInputBackend()
+        elif sys.platform == "darwin":
+            backend = QuartzBackend()
+        elif sys.platform.startswith("linux"):
+            backend = UInputBackend()
+        else:
+            raise RuntimeError(f"no native backend for platform {sys.platform}")
+        logger.info(f"Using native input backend: {backend.name}")
+        return backend
+    except Exception as e:
+        logger.warning(f"Native input backend unavailable, using pyautogui: {e}")
+        return PyAutoGUIBackend()
\ No newline at end of file
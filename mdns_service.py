@@ -1,9 +1,11 @@
 import asyncio
 import logging
 import socket
-from typing import Dict, List, Optional
-from zeroconf import ServiceInfo, Zeroconf, ServiceBrowser
-from zeroconf.asyncio import AsyncZeroconf
+import time
+from types import MappingProxyType
+from typing import Dict, List, Optional, Set
+from zeroconf import ServiceInfo, Zeroconf, ServiceStateChange
+from zeroconf.asyncio import AsyncServiceBrowser, AsyncZeroconf
 
 try:
     from .config import ServerConfig
@@ -12,6 +14,9 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+# How long (seconds) a detected local IP is reused before probing again
+LOCAL_IP_CACHE_TTL = 300.0
+
 class MDNSService:
     """Handles mDNS service registration and discovery"""
     
@@ -19,8 +24,27 @@ class MDNSService:
         self.config = config
         self.zeroconf: Optional[AsyncZeroconf] = None
         self.service_info: Optional[ServiceInfo] = None
-        self.browser: Optional[ServiceBrowser] = None
+        self.browser: Optional[AsyncServiceBrowser] = None
         self.discovered_services: Dict[str, ServiceInfo] = {}
+        self._cached_local_ip: Optional[str] = None
+        self._cached_local_ip_ts: float = 0.0
+        
+        # Discovered names are resolved by a single worker instead of a task per event
+        self._resolve_queue: Optional[asyncio.Queue] = None
+        self._resolver_task: Optional[asyncio.Task] = None
+        self._pending_resolves: Set[str] = set()
+        
+        # Updated events for a name are ignored for this many seconds after a resolve
+        self._last_resolved: Dict[str, float] = {}
+        self._resolve_debounce = 5.0
+        
+        # Precompute the parts of the registration payload that only depend on config
+        self._full_name = f"{config.service_name}.{config.service_type}"
+        self._default_props = MappingProxyType({
+            "version": config.mdns_version,
+            "protocol": config.mdns_protocol,
+            "description": "Remote Control Server"
+        })
         
     async def start(self):
         """Start the mDNS service and register our service"""
@@ -30,13 +54,28 @@ class MDNSService:
             self.zeroconf = AsyncZeroconf()
             logger.info("AsyncZeroconf initialized successfully")
             
-            # Register our service
-            await self.register_service()
-            logger.info("Service registration completed")
+            # Start the resolver worker before discovery can queue any names
+            self._resolve_queue = asyncio.Queue()
+            self._resolver_task = asyncio.create_task(self._resolver_worker())
+            
+            # Register our service and start discovery concurrently
+            registration, discovery = await asyncio.gather(
+                self.register_service(),
+                self.start_discovery(),
+                return_exceptions=True
+            )
+            if isinstance(registration, Exception):
+                logger.error(f"Service registration failed: {registration}")
+            else:
+                logger.info("Service registration completed")
+            if isinstance(discovery, Exception):
+                logger.error(f"Service discovery failed: {discovery}")
+            else:
+                logger.info("Service discovery started")
             
-            # Start service discovery
-            await self.start_discovery()
-            logger.info("Service discovery started")
+            for result in (registration, discovery):
+                if isinstance(result, Exception):
+                    raise result
             
         except Exception as e:
             logger.error(f"Failed to start mDNS service: {e}")
@@ -50,25 +89,17 @@ class MDNSService:
             logger.info(f"Port: {self.config.port}")
             logger.info(f"Host: {self.config.host}")
             
-            # Get local IP address for mDNS registration
-            # We need to get the actual local IP, not 0.0.0.0 or 127.0.0.1
+            # We need the actual local IP, not 0.0.0.0 or 127.0.0.1 (cached, so cheap)
             local_ip = self._get_local_ip()
             logger.info(f"Using IP address for mDNS: {local_ip}")
             
-            # Create service properties
-            properties = {
-                "version": "1.0",
-                "protocol": "websocket",
-                "description": "Remote Control Server"
-            }
-            
-            # Create ServiceInfo
+            # Create ServiceInfo from the precomputed name and properties
             self.service_info = ServiceInfo(
                 type_=self.config.service_type,
-                name=f"{self.config.service_name}.{self.config.service_type}",
+                name=self._full_name,
                 addresses=[socket.inet_pton(socket.AF_INET, local_ip)],
                 port=self.config.port,
-                properties=properties
+                properties=dict(self._default_props)
             )
             
             # Register the service
@@ -81,7 +112,11 @@ class MDNSService:
             raise
     
     def _get_local_ip(self):
-        """Get the local IP address for mDNS registration"""
+        """Get the local IP address for mDNS registration (cached)"""
+        if (self._cached_local_ip is not None
+                and time.monotonic() - self._cached_local_ip_ts < LOCAL_IP_CACHE_TTL):
+            return self._cached_local_ip
+        
         try:
             # Create a socket to get local IP
             with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
@@ -89,18 +124,26 @@ class MDNSService:
                 s.connect(("8.8.8.8", 80))
                 local_ip = s.getsockname()[0]
                 logger.info(f"Detected local IP: {local_ip}")
-                return local_ip
         except Exception as e:
             logger.warning(f"Could not detect local IP, using 127.0.0.1: {e}")
-            return "127.0.0.1"
+            local_ip = "127.0.0.1"
+        
+        self._cached_local_ip = local_ip
+        self._cached_local_ip_ts = time.monotonic()
+        return local_ip
+    
+    def invalidate_local_ip(self):
+        """Forget the cached local IP so the next lookup queries the OS again"""
+        self._cached_local_ip = None
+        self._cached_local_ip_ts = 0.0
     
     async def start_discovery(self):
         """Start discovering other services on the network"""
         try:
             logger.info("Starting service discovery...")
             
-            # Create service browser
-            self.browser = ServiceBrowser(
+            # Create service browser; handlers run on our event loop
+            self.browser = AsyncServiceBrowser(
                 self.zeroconf.zeroconf,
                 [self.config.service_type],
                 handlers=[self._on_service_state_change]
@@ -114,54 +157,107 @@ class MDNSService:
     def _on_service_state_change(self, zeroconf, service_type, name, state_change):
         """Handle service state changes during discovery"""
         try:
-            if state_change == "Added":
+            # Skip services that can never be ours before doing any work
+            prefix = self.config.discovery_name_prefix
+            if prefix and not name.startswith(prefix):
+                return
+            
+            if state_change is ServiceStateChange.Added:
                 logger.info(f"Service discovered: {name}")
                 # Resolve the service to get its details
-                asyncio.create_task(self._resolve_service(name))
-            elif state_change == "Removed":
+                self._schedule_resolve(name)
+            elif state_change is ServiceStateChange.Removed:
                 logger.info(f"Service removed: {name}")
                 if name in self.discovered_services:
                     del self.discovered_services[name]
-            elif state_change == "Updated":
-                logger.info(f"Service updated: {name}")
-                # Re-resolve the service
-                asyncio.create_task(self._resolve_service(name))
+                self._last_resolved.pop(name, None)
+            elif state_change is ServiceStateChange.Updated:
+                # The zeroconf cache usually holds the new records already
+                if self._update_from_cache(service_type, name):
+                    return
+                # Otherwise re-resolve the service, unless we just did
+                if time.monotonic() - self._last_resolved.get(name, 0.0) >= self._resolve_debounce:
+                    logger.info(f"Service updated: {name}")
+                    self._schedule_resolve(name)
         except Exception as e:
             logger.error(f"Error handling service state change: {e}")
     
+    def _update_from_cache(self, service_type: str, name: str) -> bool:
+        """Refresh a discovered service from the zeroconf record cache without network I/O"""
+        info = ServiceInfo(service_type, name)
+        if not info.load_from_cache(self.zeroconf.zeroconf):
+            return False
+        self._store_service(name, info)
+        return True
+    
+    def _schedule_resolve(self, name: str):
+        """Queue a name for resolution unless it is already waiting"""
+        if self._resolve_queue is None or name in self._pending_resolves:
+            return
+        self._pending_resolves.add(name)
+        self._resolve_queue.put_nowait(name)
+    
+    async def _resolver_worker(self):
+        """Resolve queued service names one at a time"""
+        queue = self._resolve_queue
+        while True:
+            name = await queue.get()
+            # Events arriving while we resolve should trigger another pass
+            self._pending_resolves.discard(name)
+            try:
+                await self._resolve_service(name)
+            finally:
+                queue.task_done()
+    
     async def _resolve_service(self, name: str):
         """Resolve a discovered service to get its details"""
         try:
             logger.info(f"Resolving service: {name}")
             info = await self.zeroconf.async_get_service_info(self.config.service_type, name)
             if info:
-                self.discovered_services[name] = info
-                logger.info(f"Service resolved: {name}")
-                logger.info(f"  Address: {info.parsed_addresses()}")
-                logger.info(f"  Port: {info.port}")
-                logger.info(f"  Properties: {info.properties}")
+                self._store_service(name, info)
             else:
                 logger.warning(f"Failed to resolve service: {name}")
         except Exception as e:
             logger.error(f"Error resolving service {name}: {e}")
     
+    def _store_service(self, name: str, info: ServiceInfo):
+        """Record resolved service details, skipping the write if nothing changed"""
+        self._last_resolved[name] = time.monotonic()
+        previous = self.discovered_services.get(name)
+        if (previous is not None
+                and previous.addresses == info.addresses
+                and previous.port == info.port
+                and previous.properties == info.properties):
+            logger.debug(f"Service unchanged: {name}")
+            return
+        self.discovered_services[name] = info
+        logger.info(f"Service resolved: {name}")
+        logger.info(f"  Address: {info.parsed_addresses()}")
+        logger.info(f"  Port: {info.port}")
+        logger.info(f"  Properties: {info.properties}")
+    
     async def update_service(self, properties: Dict[str, str]):
         """Update service properties"""
         try:
             logger.info(f"Updating service properties: {properties}")
             if self.service_info:
-                # Create new service info with updated properties
+                # Reuse the cached type/name/addresses and only swap properties
                 updated_info = ServiceInfo(
                     type_=self.service_info.type,
                     name=self.service_info.name,
                     addresses=self.service_info.addresses,
                     port=self.service_info.port,
-                    properties=properties
+                    properties=properties,
+                    server=self.service_info.server
                 )
                 
-                # Unregister old service and register new one
-                await self.zeroconf.async_unregister_service(self.service_info)
-                await self.zeroconf.async_register_service(updated_info)
+                # Announce the new records in place; no goodbye/re-announce cycle
+                try:
+                    await self.zeroconf.async_update_service(updated_info)
+                except NotImplementedError:
+                    await self.zeroconf.async_unregister_service(self.service_info)
+                    await self.zeroconf.async_register_service(updated_info)
                 self.service_info = updated_info
                 logger.info("Service updated successfully")
         except Exception as e:
@@ -174,10 +270,21 @@ class MDNSService:
             # Stop service discovery
             if self.browser:
                 logger.info("Stopping service browser...")
-                self.browser.cancel()
+                await self.browser.async_cancel()
                 self.browser = None
                 logger.info("Service browser stopped")
             
+            # Stop the resolver worker
+            if self._resolver_task:
+                self._resolver_task.cancel()
+                try:
+                    await self._resolver_task
+                except asyncio.CancelledError:
+                    pass
+                self._resolver_task = None
+                self._resolve_queue = None
+                self._pending_resolves.clear()
+            
             # Unregister our service
             if self.service_info and self.zeroconf:
                 logger.info("Unregistering service...")
@@ -1,20 +1,28 @@
 import asyncio
-import json
+import concurrent.futures
+import functools
 import logging
-from typing import Dict, Set
+import sys
+from types import MappingProxyType
+from typing import Dict, Optional, Set, Tuple
 import websockets
 from websockets.server import WebSocketServerProtocol
 import pyautogui
 import time
 
+try:
+    from .input_backend import InputBackend, PyAutoGUIBackend
+except ImportError:
+    from input_backend import InputBackend, PyAutoGUIBackend
+
 logger = logging.getLogger(__name__)
 
 # Configure pyautogui for safety
 pyautogui.FAILSAFE = True
-pyautogui.PAUSE = 0.01  # Small delay between actions
+pyautogui.PAUSE = 0  # No forced sleep after each action; it blocks the event loop
 
 # Key mapping for special keys
-SPECIAL_KEYS = {
+_SPECIAL_KEYS = {
     # Navigation keys
     'backspace': 'backspace',
     'delete': 'delete',
@@ -53,7 +61,7 @@ SPECIAL_KEYS = {
     'volumeup': 'volumeup', 'volup': 'volumeup',
     'volumedown': 'volumedown', 'voldown': 'volumedown',
     'volumemute': 'volumemute', 'mute': 'volumemute',
-    'play': 'space', 'pause': 'space', 'stop': 'stop',
+    'play': 'space', 'pause': 'space',
     'next': 'nexttrack', 'previous': 'prevtrack',
     
     # Browser keys
@@ -65,14 +73,108 @@ SPECIAL_KEYS = {
     'browserfavorites': 'browserfavorites', 'favorites': 'browserfavorites',
     'browserhome': 'browserhome', 'homepage': 'browserhome',
 }
+_SPECIAL_KEYS = {sys.intern(k): sys.intern(v) for k, v in _SPECIAL_KEYS.items()}
+SPECIAL_KEYS = MappingProxyType(_SPECIAL_KEYS)
+
+# Re-read the real cursor position after this many relative moves to correct drift
+CURSOR_RESYNC_INTERVAL = 500
+
+# Re-read the real cursor position when no move was applied for this many seconds,
+# since the physical mouse may have moved in between
+CURSOR_IDLE_RESYNC = 0.1
+
+# Bound lookup used on every keystroke
+_SPECIAL_KEYS_GET = _SPECIAL_KEYS.get
+
+@functools.lru_cache(maxsize=256)
+def _parse_key(raw: str) -> Tuple[str, Tuple[str, ...], bool]:
+    """Parse a key string into (mapped key, mapped combination keys, is combination)"""
+    key = raw.lower()
+    key = _SPECIAL_KEYS_GET(key, key)
+    if '+' not in key:
+        return key, (), False
+    # Map special keys in combinations (e.g., "ctrl+c", "alt+tab")
+    mapped = tuple(_SPECIAL_KEYS_GET(k, k) for k in (k.strip() for k in key.split('+')))
+    return key, mapped, True
+
+# Screen size is queried from the display server once per process
+_SCREEN_SIZE: Optional[Tuple[int, int]] = None
+
+def _screen_size() -> Tuple[int, int]:
+    """Get the (cached) screen size"""
+    global _SCREEN_SIZE
+    if _SCREEN_SIZE is None:
+        _SCREEN_SIZE = tuple(pyautogui.size())
+    return _SCREEN_SIZE
+
+def invalidate_screen_size():
+    """Forget the cached screen size, e.g. after a resolution change"""
+    global _SCREEN_SIZE
+    _SCREEN_SIZE = None
 
 class RemoteControl:
     """Handles mouse and keyboard control commands"""
     
-    def __init__(self):
+    # Click button name -> (backend button, is double click)
+    _CLICK_DISPATCH = {
+        "left": ("left", False),
+        "right": ("right", False),
+        "middle": ("middle", False),
+        "double": (None, True),
+    }
+    
+    def __init__(self, backend: Optional[InputBackend] = None):
+        # OS input injection; pyautogui unless a native backend is supplied
+        self._backend = backend if backend is not None else PyAutoGUIBackend()
+        
         # Get screen dimensions
-        self.screen_width, self.screen_height = pyautogui.size()
+        self.screen_width, self.screen_height = _screen_size()
         logger.info(f"Screen resolution: {self.screen_width}x{self.screen_height}")
+        self._wmax = self.screen_width - 1
+        self._hmax = self.screen_height - 1
+        
+        # Cursor position tracked server-side so relative moves need no OS query
+        self._cursor_x, self._cursor_y = self._backend.position()
+        self._relative_moves = 0
+        
+        # Moves arriving faster than this are coalesced; only the newest target is applied
+        self.min_move_interval = 0.005
+        self._pending_move: Optional[Tuple[int, int]] = None
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._last_move_time = 0.0
+        
+        # Input calls block on OS input APIs; a single worker keeps them ordered
+        self._input_executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="input"
+        )
+    
+    async def _run(self, fn, *args, **kwargs):
+        """Run a blocking input backend call on the input thread"""
+        # Apply any coalesced move first so input stays in order
+        if self._pending_move is not None:
+            self._flush_move()
+        return await asyncio.get_running_loop().run_in_executor(
+            self._input_executor, functools.partial(fn, *args, **kwargs)
+        )
+    
+    def _flush_move(self):
+        """Apply the newest pending mouse move"""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        move = self._pending_move
+        if move is None:
+            return
+        self._pending_move = None
+        self._last_move_time = asyncio.get_running_loop().time()
+        future = self._input_executor.submit(self._backend.move_abs, move[0], move[1])
+        future.add_done_callback(self._log_move_error)
+    
+    @staticmethod
+    def _log_move_error(future: concurrent.futures.Future):
+        """Report errors from moves applied outside a handler"""
+        if not future.cancelled() and future.exception() is not None:
+            logger.error(f"Error applying coalesced mouse move: {future.exception()}")
     
     async def handle_mouse_move(self, data: dict):
         """Handle mouse movement commands"""
@@ -80,17 +182,43 @@ class RemoteControl:
         y = data.get("y")
         relative = data.get("relative", False)
         
+        # The tracked position is only trusted within a burst of streamed moves
+        await self.sync_cursor()
+        
         if relative:
-            # Move relative to current position
-            pyautogui.moveRel(x, y, duration=0.01)
+            # Move relative to the tracked position, resyncing with the OS now and then
+            self._relative_moves += 1
+            if self._relative_moves >= CURSOR_RESYNC_INTERVAL:
+                self._relative_moves = 0
+                self._cursor_x, self._cursor_y = await self._run(self._backend.position)
+            x += self._cursor_x
+            y += self._cursor_y
+        
+        # Ensure coordinates are within screen bounds
+        wmax = self._wmax
+        hmax = self._hmax
+        x = 0 if x < 0 else (wmax if x > wmax else x)
+        y = 0 if y < 0 else (hmax if y > hmax else y)
+        loop = asyncio.get_running_loop()
+        if (x == self._cursor_x and y == self._cursor_y
+                and (self._flush_handle is not None
+                     or loop.time() - self._last_move_time < self.min_move_interval)):
+            # Mid-stream, the tracked cursor is current and this target is already
+            # applied or queued; outside a stream the real cursor may have moved
+            return
+        self._cursor_x, self._cursor_y = x, y
+        
+        if self._flush_handle is None and loop.time() - self._last_move_time >= self.min_move_interval:
+            # Not streaming fast enough to coalesce: apply the move right away
+            self._last_move_time = loop.time()
+            await self._run(self._backend.move_abs, x, y)
         else:
-            # Move to absolute position
-            # Ensure coordinates are within screen bounds
-            x = max(0, min(x, self.screen_width - 1))
-            y = max(0, min(y, self.screen_height - 1))
-            pyautogui.moveTo(x, y, duration=0.01)
+            # Keep only the newest target and apply it on the next tick
+            self._pending_move = (x, y)
+            if self._flush_handle is None:
+                self._flush_handle = loop.call_later(self.min_move_interval, self._flush_move)
         
-        logger.debug(f"Mouse moved to ({x}, {y})")
+        logger.debug("Mouse moved to (%s, %s)", x, y)
     
     async def handle_mouse_click(self, data: dict):
         """Handle mouse click commands"""
@@ -98,86 +226,75 @@ class RemoteControl:
         clicks = data.get("clicks", 1)
         interval = data.get("interval", 0.0)
         
-        if button == "left":
-            pyautogui.click(button="left", clicks=clicks, interval=interval)
-        elif button == "right":
-            pyautogui.click(button="right", clicks=clicks, interval=interval)
-        elif button == "middle":
-            pyautogui.click(button="middle", clicks=clicks, interval=interval)
-        elif button == "double":
-            pyautogui.doubleClick()
+        spec = self._CLICK_DISPATCH.get(button)
+        if spec is None:
+            return
+        btn, double = spec
+        if double:
+            await self._run(self._backend.double_click)
+        else:
+            await self._run(self._backend.click, btn, clicks, interval)
         
-        logger.debug(f"Mouse {button} click, {clicks} times")
+        logger.debug("Mouse %s click, %s times", button, clicks)
     
     async def handle_mouse_scroll(self, data: dict):
         """Handle mouse scroll commands"""
         amount = data.get("amount", 0)
         
-        logger.info(f"Scroll command received: amount={amount}, data={data}")
+        logger.debug("Scroll command received: amount=%s, data=%s", amount, data)
         
         if amount != 0:
             try:
-                # Use simple scroll without coordinates - pyautogui will use current mouse position
-                logger.info(f"Executing scroll: amount={amount}")
-                pyautogui.scroll(amount)
-                logger.info(f"Scroll executed successfully: amount={amount}")
+                # Use simple scroll without coordinates - scrolls at the current mouse position
+                logger.debug("Executing scroll: amount=%s", amount)
+                await self._run(self._backend.scroll, amount)
+                logger.debug("Scroll executed successfully: amount=%s", amount)
             except Exception as e:
                 logger.error(f"Error executing scroll: {e}")
         else:
-            logger.warning(f"Scroll command ignored: amount is 0")
+            logger.warning("Scroll command ignored: amount is 0")
     
     async def handle_key_press(self, data: dict):
         """Handle key press commands"""
-        key = data.get("key", "").lower()
+        # Parsing is memoized, so repeated keys and hotkeys are a cache hit
+        key, mapped_keys, is_combo = _parse_key(data.get("key", ""))
         if not key:
             return
         
-        # Handle special keys
-        if key in SPECIAL_KEYS:
-            key = SPECIAL_KEYS[key]
+        hold = data.get("hold", False)
+        release = data.get("release", False)
         
         # Handle key combinations (e.g., "ctrl+c", "alt+tab")
-        if '+' in key:
-            keys = [k.strip().lower() for k in key.split('+')]
-            # Map special keys in combinations
-            mapped_keys = []
-            for k in keys:
-                if k in SPECIAL_KEYS:
-                    mapped_keys.append(SPECIAL_KEYS[k])
-                else:
-                    mapped_keys.append(k)
-            
-            if data.get("hold", False):
+        if is_combo:
+            if hold:
                 # Hold all keys down
-                for k in mapped_keys:
-                    pyautogui.keyDown(k)
-                logger.debug(f"Key combination down: {key}")
-            elif data.get("release", False):
+                await self._run(self._backend.hold_keys, mapped_keys)
+                logger.debug("Key combination down: %s", key)
+            elif release:
                 # Release all keys
-                for k in reversed(mapped_keys):
-                    pyautogui.keyUp(k)
-                logger.debug(f"Key combination up: {key}")
+                await self._run(self._backend.release_keys, mapped_keys)
+                logger.debug("Key combination up: %s", key)
             else:
                 # Press and release combination
-                pyautogui.hotkey(*mapped_keys)
-                logger.debug(f"Key combination press: {key}")
+                await self._run(self._backend.hotkey, *mapped_keys)
+                logger.debug("Key combination press: %s", key)
         else:
             # Single key
-            if data.get("hold", False):
+            if hold:
                 # Hold key down
-                pyautogui.keyDown(key)
-                logger.debug(f"Key down: {key}")
-            elif data.get("release", False):
+                await self._run(self._backend.key_down, key)
+                logger.debug("Key down: %s", key)
+            elif release:
                 # Release key
-                pyautogui.keyUp(key)
-                logger.debug(f"Key up: {key}")
+                await self._run(self._backend.key_up, key)
+                logger.debug("Key up: %s", key)
             else:
                 # Press and release - use typewrite for space key for better reliability
                 if key == 'space':
-                    pyautogui.typewrite(' ')
+                    await self._run(self._backend.type_text, ' ')
                 else:
-                    pyautogui.press(key)
-                logger.debug(f"Key press: {key}")
+                    await self._run(self._backend.press, key)
+                logger.debug("Key press: %s", key)
     
     async def handle_key_type(self, data: dict):
         """Handle text typing commands"""
@@ -187,8 +304,9 @@ class RemoteControl:
         if text:
             # Handle special characters in text
             processed_text = self._process_text_for_typing(text)
-            pyautogui.typewrite(processed_text, interval=interval)
-            logger.debug(f"Typed text: {text[:50]}{'...' if len(text) > 50 else ''}")
+            await self._run(self._backend.type_text, processed_text, interval)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"Typed text: {text[:50]}{'...' if len(text) > 50 else ''}")
     
     def _process_text_for_typing(self, text: str) -> str:
         """Process text to handle special characters"""
@@ -208,6 +326,21 @@ class RemoteControl:
         keys = data.get("keys", [])
         interval = data.get("interval", 0.1)
         
+        # Without a delay, plain key names (no combinations or hold/release flags) can
+        # be sent in one call; with one, each key is its own job so other input can run
+        if not interval and keys and all(isinstance(k, str) and k and '+' not in k for k in keys):
+            keys = [k.lower() for k in keys]
+            if all(len(k) == 1 and k not in SPECIAL_KEYS for k in keys):
+                await self._run(self._backend.type_text, ''.join(keys))
+            elif 'space' not in keys:
+                await self._run(self._backend.press, [_SPECIAL_KEYS_GET(k, k) for k in keys])
+            else:
+                # Space goes through typewrite, as in handle_key_press
+                for key in keys:
+                    await self.handle_key_press({"key": key})
+            logger.debug("Pressed multiple keys: %s", keys)
+            return
+        
         for key in keys:
             if isinstance(key, str):
                 await self.handle_key_press({"key": key})
@@ -215,7 +348,31 @@ class RemoteControl:
                 await self.handle_key_press(key)
             await asyncio.sleep(interval)
         
-        logger.debug(f"Pressed multiple keys: {keys}")
+        logger.debug("Pressed multiple keys: %s", keys)
+    
+    def close(self):
+        """Stop the input thread and release the input backend"""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        self._pending_move = None
+        self._input_executor.shutdown(wait=True)
+        self._backend.close()
+    
+    async def sync_cursor(self) -> Tuple[int, int]:
+        """Get the tracked cursor position, re-reading it from the OS after an idle gap"""
+        if (self._pending_move is None
+                and asyncio.get_running_loop().time() - self._last_move_time > CURSOR_IDLE_RESYNC):
+            self._cursor_x, self._cursor_y = await self._run(self._backend.position)
+            self._relative_moves = 0
+        return self._cursor_x, self._cursor_y
+    
+    def clamp_position(self, x, y) -> Tuple[int, int]:
+        """Clamp a target position to the screen bounds"""
+        wmax = self._wmax
+        hmax = self._hmax
+        return (0 if x < 0 else (wmax if x > wmax else x),
+                0 if y < 0 else (hmax if y > hmax else y))
     
     def get_screen_info(self):
         """Get current screen information"""
@@ -2,17 +2,19 @@ import asyncio
 import logging
 import signal
 import sys
-from typing import Optional
+from typing import Callable, Optional
 import websockets
 
 try:
     from .websocket_handler import WebSocketHandler
     from .remote_control import RemoteControl
+    from .input_backend import create_backend
     from .mdns_service import MDNSService
     from .config import ServerConfig
 except ImportError:
     from websocket_handler import WebSocketHandler
     from remote_control import RemoteControl
+    from input_backend import create_backend
     from mdns_service import MDNSService
     from config import ServerConfig
 
@@ -23,24 +25,35 @@ class RemoteControlServer:
     
     def __init__(self, config: ServerConfig):
         self.config = config
-        self.remote_control = RemoteControl()
+        self.remote_control = RemoteControl(create_backend(config.input_backend))
         self.websocket_handler = WebSocketHandler(self.remote_control)
         self.mdns_service = MDNSService(config)
         self.websocket_server: Optional[asyncio.Server] = None
         self.running = False
+        # Set to request shutdown; start() waits on it once everything is up.
+        # Created in start() so it belongs to the loop the server runs on
+        # (on Python < 3.10 an Event binds to the loop current at creation)
+        self._stop_event: Optional[asyncio.Event] = None
+        self._stop_requested = False
+        self._stopped = False
         
     async def start(self):
         """Start the remote control server"""
+        self._stop_event = asyncio.Event()
+        if self._stop_requested:
+            self._stop_event.set()
         logger.info("Starting Remote Control Server...")
         logger.info(f"Configuration: {self.config}")
         
         try:
             # Start WebSocket server
             logger.info(f"Starting WebSocket server on {self.config.host}:{self.config.port}")
+            # Control messages are tiny; permessage-deflate costs more than it saves
             self.websocket_server = await websockets.serve(
                 self.websocket_handler.handle_client,
                 self.config.host,
-                self.config.port
+                self.config.port,
+                compression=None
             )
             logger.info(f"WebSocket server started successfully on {self.config.host}:{self.config.port}")
             
@@ -52,18 +65,31 @@ class RemoteControlServer:
             self.running = True
             logger.info("Remote Control Server is now running and ready for connections")
             
-            # Keep the server running
-            await self.websocket_server.wait_closed()
-            
         except Exception as e:
             logger.error(f"Failed to start server: {e}")
             await self.stop()
             raise
+        
+        # Keep the server running until shutdown is requested
+        try:
+            await self._stop_event.wait()
+        finally:
+            await self.stop()
+    
+    def request_stop(self):
+        """Ask a running start() to shut the server down"""
+        self._stop_requested = True
+        if self._stop_event is not None:
+            self._stop_event.set()
     
     async def stop(self):
-        """Stop the remote control server"""
+        """Stop the remote control server (safe to call more than once)"""
+        if self._stopped:
+            return
+        self._stopped = True
         logger.info("Stopping Remote Control Server...")
         self.running = False
+        self.request_stop()
         
         try:
             # Stop WebSocket server
@@ -71,6 +97,7 @@ class RemoteControlServer:
                 logger.info("Stopping WebSocket server...")
                 self.websocket_server.close()
                 await self.websocket_server.wait_closed()
+                self.websocket_server = None
                 logger.info("WebSocket server stopped")
             
             # Stop mDNS service
@@ -78,11 +105,35 @@ class RemoteControlServer:
             await self.mdns_service.stop()
             logger.info("mDNS service stopped")
             
+            # Stop the input thread
+            self.remote_control.close()
+            
             logger.info("Remote Control Server stopped successfully")
             
         except Exception as e:
             logger.error(f"Error stopping server: {e}")
 
+def uvloop_factory() -> Optional[Callable[[], asyncio.AbstractEventLoop]]:
+    """Get uvloop's event loop factory when it is installed (Linux/macOS only)"""
+    try:
+        import uvloop
+    except ImportError:
+        return None
+    return uvloop.new_event_loop
+
+def run_event_loop(coro):
+    """Run a coroutine to completion, on uvloop when it is installed"""
+    loop_factory = uvloop_factory()
+    if loop_factory is None:
+        return asyncio.run(coro)
+    if sys.version_info >= (3, 11):
+        with asyncio.Runner(loop_factory=loop_factory) as runner:
+            return runner.run(coro)
+    # Older Pythons have no loop factory hook, so fall back to the global policy
+    import uvloop
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    return asyncio.run(coro)
+
 async def main():
     """Main entry point"""
     # Configure logging
@@ -100,14 +151,14 @@ async def main():
     # Create and start server
     server = RemoteControlServer(config)
     
-    # Handle graceful shutdown
+    # Handle graceful shutdown; start() notices the request and stops the server
     def signal_handler():
         logger.info("Received shutdown signal")
-        asyncio.create_task(server.stop())
+        server.request_stop()
     
     # Register signal handlers
     for sig in (signal.SIGINT, signal.SIGTERM):
-        asyncio.get_event_loop().add_signal_handler(sig, signal_handler)
+        asyncio.get_running_loop().add_signal_handler(sig, signal_handler)
     
     try:
         await server.start()
@@ -120,4 +171,4 @@ async def main():
         await server.stop()
 
 if __name__ == "__main__":
-    asyncio.run(main()) 
\ No newline at end of file
+    run_event_loop(main()) 
\ No newline at end of file
@@ -8,7 +8,6 @@ Usage: python run.py
 
 print('=== run.py script started ===')
 
-import asyncio
 import sys
 import logging
 from pathlib import Path
@@ -16,7 +15,7 @@ from pathlib import Path
 # Add the current directory to Python path
 sys.path.insert(0, str(Path(__file__).parent))
 
-from remote_control_server import RemoteControlServer
+from remote_control_server import RemoteControlServer, run_event_loop, uvloop_factory
 from config import ServerConfig
 
 def main():
@@ -46,7 +45,9 @@ def main():
         # Start the server
         print("Starting server...")
         logger.info("Starting server...")
-        asyncio.run(server.start())
+        if uvloop_factory() is not None:
+            logger.info("Using uvloop event loop")
+        run_event_loop(server.start())
         
     except KeyboardInterrupt:
         print("\nServer stopped by user")
@@ -12,6 +12,17 @@ import websockets
 import logging
 import time
 import sys
+import threading
+from typing import List, Optional
+
+# Prefer orjson for message framing; fall back to the stdlib json module
+try:
+    import orjson
+    loads = orjson.loads
+    dumps = orjson.dumps
+except ImportError:
+    loads = json.loads
+    dumps = lambda obj: json.dumps(obj).encode()
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -25,11 +36,13 @@ class RemoteControlTestClient:
         self.websocket = None
         self.screen_width = 1920
         self.screen_height = 1080
+        # While a batch is open, outgoing messages are collected here instead of sent
+        self._batch: Optional[List[bytes]] = None
     
     async def connect(self):
         """Connect to the remote control server"""
         try:
-            self.websocket = await websockets.connect(self.uri)
+            self.websocket = await websockets.connect(self.uri, compression=None)
             logger.info(f"Connected to remote control server at {self.uri}")
             
             # Start listening for messages
@@ -43,7 +56,7 @@ class RemoteControlTestClient:
         try:
             async for message in self.websocket:
                 try:
-                    data = json.loads(message)
+                    data = loads(message)
                     await self.handle_message(data)
                 except json.JSONDecodeError:
                     logger.warning(f"Received invalid JSON: {message}")
@@ -68,6 +81,11 @@ class RemoteControlTestClient:
             server_info = data.get("server_info", {})
             logger.info(f"Server: {server_info.get('name')} v{server_info.get('version')}")
         
+        elif message_type == "batch":
+            # Several server messages combined into one frame
+            for item in data.get("items", []):
+                await self.handle_message(item)
+        
         elif message_type == "pong":
             logger.info(f"Received pong with timestamp: {data.get('timestamp')}")
         
@@ -77,6 +95,32 @@ class RemoteControlTestClient:
         else:
             logger.info(f"Received message: {data}")
     
+    async def _send(self, message: dict):
+        """Serialize a message and send it, or add it to the open batch"""
+        if self._batch is not None:
+            self._batch.append(dumps(message))
+        else:
+            await self.websocket.send(dumps(message))
+    
+    def start_batch(self):
+        """Collect subsequent messages instead of sending them one by one"""
+        self._batch = []
+    
+    def end_batch(self) -> List[bytes]:
+        """Stop collecting messages and return the ones collected"""
+        batch, self._batch = self._batch or [], None
+        return batch
+    
+    async def send_many(self, messages: List[bytes]):
+        """Send serialized messages back to back without waiting between them"""
+        if self.websocket and messages:
+            # One frame per command; a fragmented send would reach the server
+            # as a single message. send() only blocks when the write buffer is
+            # full, so this costs no round trips and keeps the commands in order.
+            for message in messages:
+                await self.websocket.send(message)
+            logger.info(f"Sent batch of {len(messages)} commands")
+    
     async def send_ping(self):
         """Send a ping message to the server"""
         if self.websocket:
@@ -84,7 +128,7 @@ class RemoteControlTestClient:
                 "type": "ping",
                 "timestamp": time.time()
             }
-            await self.websocket.send(json.dumps(message))
+            await self._send(message)
     
     async def send_mouse_move(self, x: int, y: int, relative: bool = False):
         """Send mouse movement command"""
@@ -95,7 +139,7 @@ class RemoteControlTestClient:
                 "y": y,
                 "relative": relative
             }
-            await self.websocket.send(json.dumps(message))
+            await self._send(message)
             logger.info(f"Mouse move: ({x}, {y}) {'relative' if relative else 'absolute'}")
     
     async def send_mouse_click(self, button: str = "left", clicks: int = 1, interval: float = 0.0):
@@ -107,7 +151,7 @@ class RemoteControlTestClient:
                 "clicks": clicks,
                 "interval": interval
             }
-            await self.websocket.send(json.dumps(message))
+            await self._send(message)
             logger.info(f"Mouse click: {button} button, {clicks} times")
     
     async def send_mouse_scroll(self, clicks: int, x: int = 0, y: int = 0):
@@ -119,7 +163,7 @@ class RemoteControlTestClient:
                 "x": x,
                 "y": y
             }
-            await self.websocket.send(json.dumps(message))
+            await self._send(message)
             logger.info(f"Mouse scroll: {clicks} clicks at ({x}, {y})")
     
     async def send_key_press(self, key: str, hold: bool = False, release: bool = False):
@@ -131,7 +175,7 @@ class RemoteControlTestClient:
                 "hold": hold,
                 "release": release
             }
-            await self.websocket.send(json.dumps(message))
+            await self._send(message)
             action = "hold" if hold else "release" if release else "press"
             logger.info(f"Key {action}: {key}")
     
@@ -143,7 +187,7 @@ class RemoteControlTestClient:
                 "text": text,
                 "interval": interval
             }
-            await self.websocket.send(json.dumps(message))
+            await self._send(message)
             logger.info(f"Typing text: {text[:50]}{'...' if len(text) > 50 else ''}")
     
     async def close(self):
@@ -199,6 +243,63 @@ async def demo_remote_control():
     logger.info("Demo completed!")
     await client.close()
 
+async def run_command(client: RemoteControlTestClient, command: List[str]) -> bool:
+    """Send one interactive command; returns False for unknown commands"""
+    cmd = command[0].lower()
+    
+    if cmd == "move" and len(command) == 3:
+        x, y = int(command[1]), int(command[2])
+        await client.send_mouse_move(x, y)
+    
+    elif cmd == "moverel" and len(command) == 3:
+        dx, dy = int(command[1]), int(command[2])
+        await client.send_mouse_move(dx, dy, relative=True)
+    
+    elif cmd == "click" and len(command) == 2:
+        button = command[1].lower()
+        await client.send_mouse_click(button)
+    
+    elif cmd == "scroll" and len(command) == 2:
+        clicks = int(command[1])
+        await client.send_mouse_scroll(clicks)
+    
+    elif cmd == "key" and len(command) == 2:
+        key = command[1]
+        await client.send_key_press(key)
+    
+    elif cmd == "hold" and len(command) == 2:
+        key = command[1]
+        await client.send_key_press(key, hold=True)
+    
+    elif cmd == "release" and len(command) == 2:
+        key = command[1]
+        await client.send_key_press(key, release=True)
+    
+    elif cmd == "type" and len(command) > 1:
+        text = " ".join(command[1:])
+        await client.send_key_type(text)
+    
+    elif cmd == "ping":
+        await client.send_ping()
+    
+    else:
+        return False
+    return True
+
+def read_stdin(loop: asyncio.AbstractEventLoop, lines: asyncio.Queue):
+    """Feed lines typed on stdin to the event loop; None marks end of input"""
+    line = ""
+    while line is not None:
+        try:
+            line = input("Enter command: ")
+        except (EOFError, OSError):
+            line = None
+        try:
+            loop.call_soon_threadsafe(lines.put_nowait, line)
+        except RuntimeError:
+            # The event loop has already closed
+            return
+
 async def interactive_remote_control():
     """Interactive remote control client"""
     client = RemoteControlTestClient()
@@ -217,59 +318,46 @@ async def interactive_remote_control():
     print("  'release <key>' - Release a key")
     print("  'type <text>' - Type text")
     print("  'ping' - Send ping to server")
+    print("  'batch: <cmd>; <cmd>; ...' - Send several commands back to back")
     print("  'quit' - Exit client")
     print()
     
+    # Read stdin on a daemon thread so incoming messages are still handled while
+    # waiting for the next command, and a blocked input() never delays exit
+    lines: asyncio.Queue = asyncio.Queue()
+    threading.Thread(
+        target=read_stdin, args=(asyncio.get_running_loop(), lines), daemon=True
+    ).start()
+    
     try:
         while True:
-            command = input("Enter command: ").strip().split()
-            if not command:
-                continue
-                
-            cmd = command[0].lower()
-            
-            if cmd == "move" and len(command) == 3:
-                x, y = int(command[1]), int(command[2])
-                await client.send_mouse_move(x, y)
-            
-            elif cmd == "moverel" and len(command) == 3:
-                dx, dy = int(command[1]), int(command[2])
-                await client.send_mouse_move(dx, dy, relative=True)
-            
-            elif cmd == "click" and len(command) == 2:
-                button = command[1].lower()
-                await client.send_mouse_click(button)
-            
-            elif cmd == "scroll" and len(command) == 2:
-                clicks = int(command[1])
-                await client.send_mouse_scroll(clicks)
-            
-            elif cmd == "key" and len(command) == 2:
-                key = command[1]
-                await client.send_key_press(key)
-            
-            elif cmd == "hold" and len(command) == 2:
-                key = command[1]
-                await client.send_key_press(key, hold=True)
-            
-            elif cmd == "release" and len(command) == 2:
-                key = command[1]
-                await client.send_key_press(key, release=True)
+            line = await lines.get()
+            if line is None:
+                break
+            line = line.strip()
             
-            elif cmd == "type" and len(command) > 1:
-                text = " ".join(command[1:])
-                await client.send_key_type(text)
+            if line.lower().startswith("batch:"):
+                # Collect every command in the line and send them back to back
+                client.start_batch()
+                for part in line[len("batch:"):].split(";"):
+                    command = part.strip().split()
+                    if command and not await run_command(client, command):
+                        print(f"Invalid command in batch: {part.strip()}")
+                await client.send_many(client.end_batch())
+                continue
             
-            elif cmd == "ping":
-                await client.send_ping()
+            command = line.split()
+            if not command:
+                continue
             
-            elif cmd == "quit":
+            if command[0].lower() == "quit":
                 break
             
-            else:
+            if not await run_command(client, command):
                 print("Invalid command. Use 'move <x> <y>', 'click <button>', 'key <key>', etc.")
     
-    except KeyboardInterrupt:
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        # asyncio.run cancels the main task on Ctrl+C
         print("\nInterrupted by user")
     
     finally:
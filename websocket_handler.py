@@ -1,7 +1,7 @@
 import asyncio
 import json
 import logging
-from typing import Set
+from typing import Optional
 import websockets
 from websockets.server import WebSocketServerProtocol
 import time
@@ -11,113 +11,237 @@ try:
 except ImportError:
     from remote_control import RemoteControl
 
+# Prefer orjson for message framing; fall back to the stdlib json module.
+# dumps() returns bytes, which websockets sends as-is in a binary frame.
+try:
+    import orjson
+    loads = orjson.loads
+    dumps = orjson.dumps
+except ImportError:
+    loads = json.loads
+    dumps = lambda obj: json.dumps(obj).encode()
+
 logger = logging.getLogger(__name__)
 
+# Maximum number of outbound messages queued per client
+OUTBOX_SIZE = 256
+
+# Maximum number of inbound commands queued per client; when full, reading from
+# the socket pauses so a slow input thread pushes back on the client
+INBOX_SIZE = 128
+
+# Maximum number of queued messages combined into a single "batch" frame
+MAX_BATCH_MESSAGES = 64
+
+# Frames larger than this are dropped without being parsed
+MAX_CMD_BYTES = 4096
+
+# First character of a valid command frame, as bytes (binary) or str (text)
+_COMMAND_START = (b"{", "{")
+
 class WebSocketHandler:
     """Handles WebSocket connections and message processing"""
     
     def __init__(self, remote_control: RemoteControl):
         self.remote_control = remote_control
-        self.clients: Set[WebSocketServerProtocol] = set()
-    
-    async def cleanup_connections(self):
-        """Clean up any stale connections"""
-        logger.info(f"Cleaning up connections. Current clients: {len(self.clients)}")
-        for client in list(self.clients):
-            try:
-                if client.closed:
-                    self.clients.discard(client)
-                    logger.info(f"Removed closed client {id(client)}")
-            except Exception as e:
-                logger.error(f"Error cleaning up client {id(client)}: {e}")
-                self.clients.discard(client)
-        logger.info(f"Cleanup complete. Remaining clients: {len(self.clients)}")
+        self._client_count = 0
+        # Command type -> remote control handler, resolved with one dict lookup
+        self._dispatch = {
+            "mouse_move": remote_control.handle_mouse_move,
+            "mouse_click": remote_control.handle_mouse_click,
+            "mouse_scroll": remote_control.handle_mouse_scroll,
+            "key_press": remote_control.handle_key_press,
+            "key_type": remote_control.handle_key_type,
+            "multiple_keys": remote_control.handle_multiple_keys,
+        }
+        # Number of mouse_move commands merged into another instead of dispatched
+        self.coalesced_moves = 0
+        # Everything in the welcome message except client_id is fixed, so serialize
+        # it once; each connection only prepends its client_id
+        self._welcome_tail = dumps({
+            "type": "welcome",
+            "screen_info": remote_control.get_screen_info(),
+            "server_info": {
+                "name": "remote-control",
+                "version": "1.0"
+            }
+        })[1:]
     
     async def handle_client(self, websocket: WebSocketServerProtocol):
         """Handle individual WebSocket client connections"""
         client_id = id(websocket)
+        worker: Optional[asyncio.Task] = None
+        writer: Optional[asyncio.Task] = None
         try:
             client_address = websocket.remote_address
         except AttributeError:
             client_address = "unknown"
         
-        # Clean up any stale connections first
-        await self.cleanup_connections()
-        
-        self.clients.add(websocket)
+        self._client_count += 1
         logger.info(f"Remote control client {client_id} connected from {client_address}")
-        logger.info(f"Total connected clients: {len(self.clients)}")
+        logger.info(f"Total connected clients: {self._client_count}")
         
         try:
+            # Outbound messages go through a queue so reads never wait on writes
+            outbox: asyncio.Queue = asyncio.Queue(maxsize=OUTBOX_SIZE)
+            writer = asyncio.create_task(self._writer(websocket, outbox))
+            
             # Send welcome message with screen info
-            welcome_message = {
-                "type": "welcome",
-                "client_id": client_id,
-                "screen_info": self.remote_control.get_screen_info(),
-                "server_info": {
-                    "name": "remote-control",
-                    "version": "1.0"
-                }
-            }
-            await websocket.send(json.dumps(welcome_message))
+            self._enqueue(outbox, b'{"client_id":%d,' % client_id + self._welcome_tail, client_id)
             logger.info(f"Sent welcome message to client {client_id}")
             
-            # Handle incoming commands
+            # Commands are executed by a worker so queued mouse moves can be merged
+            inbox: asyncio.Queue = asyncio.Queue(maxsize=INBOX_SIZE)
+            worker = asyncio.create_task(self._process_inbox(client_id, inbox, outbox))
+            
+            # Handle incoming commands; binary frames (bytes) skip websockets' UTF-8
+            # decoding and are parsed directly, text frames still work
             async for message in websocket:
+                # Every command is a JSON object, so skip anything that can't be
+                # one without paying for the parser or a decode exception
+                if message[:1] not in _COMMAND_START:
+                    logger.debug("Ignoring non-command frame from client %s", client_id)
+                    continue
+                if len(message) > MAX_CMD_BYTES:
+                    logger.warning(f"Ignoring oversized frame ({len(message)} bytes) from client {client_id}")
+                    continue
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("Received message from client %s: %s", client_id, message)
                 try:
-                    logger.info(f"Received message from client {client_id}: {message}")
-                    data = json.loads(message)
-                    await self.handle_command(websocket, data)
-                except json.JSONDecodeError:
+                    data = loads(message)
+                except (ValueError, RecursionError):
+                    # ValueError covers JSONDecodeError and UnicodeDecodeError from
+                    # binary frames; deeply nested input hits the recursion limit
                     logger.warning(f"Invalid JSON from client {client_id}: {message}")
-                except Exception as e:
-                    logger.error(f"Error handling command from client {client_id}: {e}")
+                    continue
+                await inbox.put(data)
+            
+            # Let commands received before the close finish
+            await inbox.join()
                     
         except websockets.exceptions.ConnectionClosed:
             logger.info(f"Remote control client {client_id} disconnected")
         finally:
-            try:
-                self.clients.discard(websocket)  # Use discard instead of remove to avoid KeyError
-                logger.info(f"Client {client_id} removed. Total clients: {len(self.clients)}")
-            except Exception as e:
-                logger.error(f"Error removing client {client_id}: {e}")
+            if worker is not None:
+                worker.cancel()
+            if writer is not None:
+                writer.cancel()
+            self._client_count -= 1
+            logger.info(f"Client {client_id} removed. Total clients: {self._client_count}")
+    
+    async def _writer(self, websocket: WebSocketServerProtocol, outbox: asyncio.Queue):
+        """Send queued outbound messages to the client, batching any backlog into one frame"""
+        try:
+            while True:
+                batch = [await outbox.get()]
+                while not outbox.empty() and len(batch) < MAX_BATCH_MESSAGES:
+                    batch.append(outbox.get_nowait())
+                if len(batch) == 1:
+                    await websocket.send(batch[0])
+                else:
+                    # Messages are already serialized, so splice them into a batch envelope
+                    await websocket.send(b'{"type":"batch","items":[' + b",".join(batch) + b"]}")
+        except websockets.exceptions.ConnectionClosed:
+            pass
+    
+    @staticmethod
+    def _enqueue(outbox: asyncio.Queue, message: bytes, client_id: int):
+        """Queue a message for the client's writer, dropping it if the client can't keep up"""
+        try:
+            outbox.put_nowait(message)
+        except asyncio.QueueFull:
+            logger.warning(f"Outbound queue full for client {client_id}, dropping message")
+    
+    async def _process_inbox(self, client_id: int, inbox: asyncio.Queue,
+                             outbox: asyncio.Queue):
+        """Execute queued commands, merging runs of consecutive mouse moves"""
+        while True:
+            batch = [await inbox.get()]
+            while not inbox.empty():
+                batch.append(inbox.get_nowait())
+            
+            pending_move = None
+            for data in batch:
+                if isinstance(data, dict) and data.get("type") == "mouse_move":
+                    if pending_move is None:
+                        pending_move = data
+                        continue
+                    merged = await self._merge_moves(pending_move, data)
+                    if merged is not None:
+                        pending_move = merged
+                        self.coalesced_moves += 1
+                        continue
+                # Flush the merged move before anything that depends on cursor position
+                if pending_move is not None:
+                    await self._execute_command(client_id, pending_move, outbox)
+                    pending_move = None
+                if isinstance(data, dict) and data.get("type") == "mouse_move":
+                    pending_move = data
+                else:
+                    await self._execute_command(client_id, data, outbox)
+            if pending_move is not None:
+                await self._execute_command(client_id, pending_move, outbox)
+            for _ in batch:
+                inbox.task_done()
+    
+    async def _merge_moves(self, previous: dict, current: dict) -> Optional[dict]:
+        """Combine two consecutive mouse moves into one, or None if they can't be merged"""
+        if not current.get("relative", False):
+            # An absolute move overrides whatever came before it
+            return current
+        try:
+            # Resolve where the previous move leaves the cursor, clamped the same way
+            # applying it would be, so the relative delta starts from the right place
+            remote_control = self.remote_control
+            x = previous.get("x")
+            y = previous.get("y")
+            if previous.get("relative", False):
+                cursor_x, cursor_y = await remote_control.sync_cursor()
+                x += cursor_x
+                y += cursor_y
+            x, y = remote_control.clamp_position(x, y)
+            return {
+                "type": "mouse_move",
+                "x": x + current.get("x"),
+                "y": y + current.get("y"),
+                "relative": False
+            }
+        except TypeError:
+            return None
+        except Exception as e:
+            # Reading the cursor failed; apply the moves one at a time instead
+            logger.error(f"Error reading cursor position for move merge: {e}")
+            return None
     
-    async def handle_command(self, websocket: WebSocketServerProtocol, data: dict):
+    async def _execute_command(self, client_id: int, data,
+                               outbox: asyncio.Queue):
+        """Run one command, logging failures so the worker keeps going"""
+        try:
+            await self.handle_command(client_id, data, outbox)
+        except Exception as e:
+            logger.error(f"Error handling command from client {client_id}: {e}")
+    
+    async def handle_command(self, client_id: int, data: dict,
+                             outbox: asyncio.Queue):
         """Handle incoming remote control commands"""
         command_type = data.get("type", "unknown")
-        client_id = id(websocket)
         
-        logger.info(f"Processing command '{command_type}' from client {client_id}")
-        logger.info(f"Command data: {data}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Processing command '%s' from client %s", command_type, client_id)
+            logger.debug("Command data: %s", data)
         
         try:
-            if command_type == "mouse_move":
-                await self.remote_control.handle_mouse_move(data)
-                
-            elif command_type == "mouse_click":
-                await self.remote_control.handle_mouse_click(data)
-                
-            elif command_type == "mouse_scroll":
-                logger.info(f"Routing scroll command to handler: {data}")
-                await self.remote_control.handle_mouse_scroll(data)
-                logger.info(f"Scroll command handled successfully")
-                
-            elif command_type == "key_press":
-                await self.remote_control.handle_key_press(data)
-                
-            elif command_type == "key_type":
-                await self.remote_control.handle_key_type(data)
-                
-            elif command_type == "multiple_keys":
-                await self.remote_control.handle_multiple_keys(data)
+            handler = self._dispatch.get(command_type)
+            if handler is not None:
+                await handler(data)
                 
             elif command_type == "ping":
                 response = {
                     "type": "pong", 
                     "timestamp": data.get("timestamp")
                 }
-                await websocket.send(json.dumps(response))
-                logger.info(f"Sent pong response to client {client_id}")
+                self._enqueue(outbox, dumps(response), client_id)
+                logger.debug("Sent pong response to client %s", client_id)
                 
             else:
                 logger.warning(f"Unknown command type '{command_type}' from client {client_id}")
@@ -130,9 +254,9 @@ class WebSocketHandler:
                 "command": command_type,
                 "error": str(e)
             }
-            await websocket.send(json.dumps(error_response))
-            logger.info(f"Sent error response to client {client_id}: {error_response}")
+            self._enqueue(outbox, dumps(error_response), client_id)
+            logger.debug("Sent error response to client %s: %s", client_id, error_response)
     
     def get_connected_clients_count(self):
         """Get the number of connected clients"""
-        return len(self.clients) 
\ No newline at end of file
+        return self._client_count 
\ No newline at end of file